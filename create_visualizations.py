@@ -1,5 +1,5 @@
 # Unemployment Alpha Model - Visualization Generator
-# Creates 8 professional portfolio charts (300 DPI)
+# Creates 8 professional portfolio charts (150 DPI, VIZ_DPI=300 for publication)
 # Usage: python create_visualizations.py
 
 import pandas as pd
@@ -7,27 +7,110 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
 
+def drawdown(cumulative):
+    # Percent drawdown from running peak plus its minimum (max drawdown)
+    dd = (cumulative / np.maximum.accumulate(cumulative) - 1) * 100
+    return dd, dd.min()
+
+
+def rolling_sharpe(returns, window, periods_per_year=252):
+    # Annualized rolling Sharpe from prefix sums of r and r^2 (one pass per series)
+    valid = ~np.isnan(returns)
+    r = np.where(valid, returns, 0.0)
+    csum = np.concatenate([[0.0], np.cumsum(r)])
+    csum_sq = np.concatenate([[0.0], np.cumsum(r * r)])
+    ccount = np.concatenate([[0], np.cumsum(valid)])
+
+    total = csum[window:] - csum[:-window]
+    total_sq = csum_sq[window:] - csum_sq[:-window]
+    count = ccount[window:] - ccount[:-window]
+
+    mean = total / window
+    std = np.sqrt(np.maximum(total_sq - total * mean, 0.0) / (window - 1))
+
+    # Windows containing a NaN stay NaN, matching pandas rolling()
+    sharpe = np.full(len(returns), np.nan)
+    sharpe[window - 1:] = np.where(count == window, mean / std * np.sqrt(periods_per_year), np.nan)
+    return sharpe
+
+
+def load_results(name):
+    # Read a results table from Parquet, or from a CSV export when that is
+    # newer (the parsed CSV is cached as Parquet for later runs)
+    csv_path = results_dir / f'{name}.csv'
+    parquet_path = results_dir / f'{name}.parquet'
+
+    if parquet_path.exists() and (not csv_path.exists() or
+                                  parquet_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return pd.read_parquet(parquet_path)
+
+    df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    try:
+        df.to_parquet(parquet_path)
+    except ImportError:
+        # No parquet engine installed, keep reading the CSV
+        pass
+    return df
+
+
+def new_chart(figsize, *args, **kwargs):
+    # Clear the shared Figure, resize it and lay out fresh axes
+    fig.clf()
+    fig.set_size_inches(figsize)
+    return fig.subplots(*args, **kwargs)
+
+
 # Setup paths
 script_dir = Path(__file__).parent
 results_dir = script_dir / 'results'
 viz_dir = script_dir / 'visualizations'
 viz_dir.mkdir(exist_ok=True)
 
+# Output resolution; PNG render and encode time scale with pixel count
+DPI = int(os.environ.get('VIZ_DPI', 150))
+
+# Event dates used across charts, parsed once
+KEY_DATES = {name: pd.Timestamp(date) for name, date in {
+    'covid_start': '2020-02-01',
+    'covid_end': '2020-04-30',
+    'covid_mid': '2020-03-15',
+    'covid_crash': '2020-03-01',
+    'recovery': '2021-06-01',
+    'spy_peak': '2020-02-19',
+    'spy_bottom': '2020-03-23',
+    'case_study_start': '2020-01-01',
+    'case_study_end': '2020-06-30',
+}.items()}
+
 # Load data
-backtest = pd.read_csv(results_dir / 'full_backtest_results.csv', index_col=0, parse_dates=True)
-signals = pd.read_csv(results_dir / 'employment_signals.csv', index_col=0, parse_dates=True)
+backtest = load_results('full_backtest_results')
+signals = load_results('employment_signals')
 
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
+# Layout is solved by constrained_layout at draw time, so no per-chart
+# tight_layout() call or second bbox_inches='tight' render pass is needed
+plt.rcParams.update({
+    'figure.constrained_layout.use': True,
+    'savefig.bbox': 'standard',
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+})
+
+# One Figure is reused for every chart so its canvas is only allocated once
+fig = plt.figure()
+
 # Chart 1: Equity curve comparison
 backtest['portfolio_6040'] = (1 + (0.6 * backtest['spy_return'] + 0.4 * backtest['tlt_return']).fillna(0)).cumprod()
-fig, ax = plt.subplots(figsize=(14, 8))
+ax = new_chart((14, 8))
 
 # Plot all strategies
 ax.plot(backtest.index, backtest['strategy_cumulative'],
@@ -39,11 +122,11 @@ ax.plot(backtest.index, backtest['portfolio_6040'],
 
 # Highlight recession periods
 recession_periods = [
-    ('2020-02-01', '2020-04-30'),  # COVID crash
+    (KEY_DATES['covid_start'], KEY_DATES['covid_end']),  # COVID crash
 ]
 for start, end in recession_periods:
-    ax.axvspan(pd.to_datetime(start), pd.to_datetime(end),
-              alpha=0.2, color='red', label='COVID Recession' if start == '2020-02-01' else '')
+    ax.axvspan(start, end,
+              alpha=0.2, color='red', label='COVID Recession' if start == KEY_DATES['covid_start'] else '')
 
 ax.set_title('Equity Curve Comparison: Unemployment Alpha vs Benchmarks (2010-2024)',
             fontsize=16, fontweight='bold', pad=20)
@@ -55,10 +138,11 @@ ax.set_ylim(bottom=0.8)
 
 # Add annotations for final values
 final_date = backtest.index[-1]
+finals = {c: backtest[c].iat[-1] for c in ['strategy_cumulative', 'spy_cumulative', 'portfolio_6040']}
 for cumul, label, color, yoffset in [
-    (backtest['strategy_cumulative'].iloc[-1], 'Strategy', '#2E86AB', 0),
-    (backtest['spy_cumulative'].iloc[-1], 'SPY', '#A23B72', -0.5),
-    (backtest['portfolio_6040'].iloc[-1], '60/40', '#F18F01', 0.5)
+    (finals['strategy_cumulative'], 'Strategy', '#2E86AB', 0),
+    (finals['spy_cumulative'], 'SPY', '#A23B72', -0.5),
+    (finals['portfolio_6040'], '60/40', '#F18F01', 0.5)
 ]:
     ax.annotate(f'{label}: ${100000*cumul:,.0f}',
                xy=(final_date, cumul),
@@ -67,17 +151,15 @@ for cumul, label, color, yoffset in [
                fontsize=9, color=color, fontweight='bold',
                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.8, edgecolor=color))
 
-plt.tight_layout()
-plt.savefig(viz_dir / '1_equity_curve_comparison.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '1_equity_curve_comparison.png', dpi=DPI)
 
 # Chart 2: Drawdown comparison
 # Calculate drawdowns
-strategy_dd = (backtest['strategy_cumulative'] / backtest['strategy_cumulative'].cummax() - 1) * 100
-spy_dd = (backtest['spy_cumulative'] / backtest['spy_cumulative'].cummax() - 1) * 100
-portfolio_6040_dd = (backtest['portfolio_6040'] / backtest['portfolio_6040'].cummax() - 1) * 100
+strategy_dd, strategy_max_dd = drawdown(backtest['strategy_cumulative'].to_numpy())
+spy_dd, spy_max_dd = drawdown(backtest['spy_cumulative'].to_numpy())
+portfolio_6040_dd, portfolio_6040_max_dd = drawdown(backtest['portfolio_6040'].to_numpy())
 
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+ax1, ax2 = new_chart((14, 10), 2, 1)
 
 # Top: Drawdown over time
 ax1.fill_between(backtest.index, strategy_dd, 0, alpha=0.7, color='#2E86AB', label='Unemployment Alpha')
@@ -92,7 +174,7 @@ ax1.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
 
 # Bottom: Bar chart of max drawdowns
 strategies = ['Unemployment\nAlpha', 'SPY\nBuy & Hold', '60/40\nPortfolio']
-max_dds = [strategy_dd.min(), spy_dd.min(), portfolio_6040_dd.min()]
+max_dds = [strategy_max_dd, spy_max_dd, portfolio_6040_max_dd]
 colors = ['#2E86AB', '#A23B72', '#F18F01']
 
 bars = ax2.bar(strategies, max_dds, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
@@ -107,23 +189,24 @@ for bar, dd in zip(bars, max_dds):
     ax2.text(bar.get_x() + bar.get_width()/2., height - 2,
             f'{dd:.1f}%', ha='center', va='top', fontsize=12, fontweight='bold', color='white')
 
-plt.tight_layout()
-plt.savefig(viz_dir / '2_drawdown_comparison.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '2_drawdown_comparison.png', dpi=DPI)
 
 # Chart 3: Allocation timeline
 # Resample signals to monthly for cleaner visualization
-monthly_signals = signals[['signal', 'spy_weight', 'smoothed_surprise']].copy()
+monthly_signals = signals[['signal', 'spy_weight', 'smoothed_surprise']]
 
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), sharex=True)
+ax1, ax2 = new_chart((14, 10), 2, 1, sharex=True)
 
 # Top: Signal regime over time
 signal_map = {-1: 'Risk-OFF', 0: 'Neutral', 1: 'Risk-ON'}
 signal_colors = {-1: '#E63946', 0: '#F1FAEE', 1: '#06A77D'}
 
-for signal_val, color in signal_colors.items():
-    mask = monthly_signals['signal'] == signal_val
-    ax1.fill_between(monthly_signals.index, 0, 1, where=mask,
+# Map each month to its regime slot in one pass, then derive the masks from that
+sig = monthly_signals['signal'].to_numpy()
+regime_idx = np.select([sig == -1, sig == 0, sig == 1], [0, 1, 2], default=-1)
+
+for k, (signal_val, color) in enumerate(signal_colors.items()):
+    ax1.fill_between(monthly_signals.index, 0, 1, where=regime_idx == k,
                      alpha=0.7, color=color, label=signal_map[signal_val], step='post')
 
 ax1.set_title('Risk Regime Timeline (2010-2024)', fontsize=16, fontweight='bold', pad=20)
@@ -134,9 +217,9 @@ ax1.legend(loc='upper right', fontsize=11)
 ax1.grid(True, alpha=0.3, axis='x')
 
 # Highlight COVID
-ax1.axvspan(pd.to_datetime('2020-02-01'), pd.to_datetime('2020-04-30'),
+ax1.axvspan(KEY_DATES['covid_start'], KEY_DATES['covid_end'],
            alpha=0.2, color='red', zorder=-1)
-ax1.text(pd.to_datetime('2020-03-15'), 0.9, 'COVID', fontsize=10,
+ax1.text(KEY_DATES['covid_mid'], 0.9, 'COVID', fontsize=10,
         ha='center', fontweight='bold', color='darkred')
 
 # Bottom: SPY allocation weight
@@ -150,12 +233,10 @@ ax2.grid(True, alpha=0.3)
 ax2.axhline(y=50, color='gray', linestyle='--', linewidth=1, alpha=0.5, label='Neutral (50%)')
 ax2.legend(loc='lower right', fontsize=10)
 
-plt.tight_layout()
-plt.savefig(viz_dir / '3_allocation_timeline.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '3_allocation_timeline.png', dpi=DPI)
 
 # Chart 4: Signal evolution with composite index
-fig, ax = plt.subplots(figsize=(14, 8))
+ax = new_chart((14, 8))
 
 # Plot composite surprise index
 ax.plot(signals.index, signals['smoothed_surprise'],
@@ -182,28 +263,24 @@ ax.grid(True, alpha=0.3)
 
 # Annotate key events
 events = [
-    ('2020-03-01', 2.5, 'COVID Crash\nMassive jobless claims'),
-    ('2021-06-01', 1.2, 'Recovery\nPayrolls surge'),
+    (KEY_DATES['covid_crash'], 2.5, 'COVID Crash\nMassive jobless claims'),
+    (KEY_DATES['recovery'], 1.2, 'Recovery\nPayrolls surge'),
 ]
 for date, y, text in events:
-    ax.annotate(text, xy=(pd.to_datetime(date), y),
+    ax.annotate(text, xy=(date, y),
                xytext=(10, 10), textcoords='offset points',
                fontsize=9, bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7),
                arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
 
-plt.tight_layout()
-plt.savefig(viz_dir / '4_signal_evolution.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '4_signal_evolution.png', dpi=DPI)
 
 # Chart 5: Rolling 12-month Sharpe ratio
 # Calculate rolling Sharpe (12-month window)
 window = 252  # 1 year daily
-strategy_rolling_sharpe = (backtest['portfolio_return_net'].rolling(window).mean() /
-                          backtest['portfolio_return_net'].rolling(window).std()) * np.sqrt(252)
-spy_rolling_sharpe = (backtest['spy_return'].rolling(window).mean() /
-                     backtest['spy_return'].rolling(window).std()) * np.sqrt(252)
+strategy_rolling_sharpe = rolling_sharpe(backtest['portfolio_return_net'].to_numpy(), window)
+spy_rolling_sharpe = rolling_sharpe(backtest['spy_return'].to_numpy(), window)
 
-fig, ax = plt.subplots(figsize=(14, 8))
+ax = new_chart((14, 8))
 
 ax.plot(backtest.index, strategy_rolling_sharpe,
        linewidth=2.5, color='#2E86AB', label='Unemployment Alpha', alpha=0.9, zorder=3)
@@ -224,30 +301,22 @@ ax.set_ylim(-1, 3)
 ax.legend(loc='upper left', fontsize=11, framealpha=0.95)
 ax.grid(True, alpha=0.3)
 
-plt.tight_layout()
-plt.savefig(viz_dir / '5_rolling_sharpe.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '5_rolling_sharpe.png', dpi=DPI)
 
 # Chart 6: Factor attribution
 # Calculate individual indicator signal contributions
-indicators = {
-    'Unemployment Rate': -signals['unrate_surprise'] * 0.4,
-    'Jobless Claims': -signals['claims_surprise'] * 0.3,
-    'Payrolls': signals['payrolls_surprise'] * 0.2,
-    'Labor Participation': signals['participation_surprise'] * 0.1
-}
+indicator_cols = ['unrate_surprise', 'claims_surprise', 'payrolls_surprise', 'participation_surprise']
+indicator_names = ['Unemployment Rate', 'Jobless Claims', 'Payrolls', 'Labor Participation']
+indicator_weights = np.array([-0.4, -0.3, 0.2, 0.1])
 
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+ax1, ax2 = new_chart((16, 7), 1, 2)
 
 # Left: Stacked area chart of contributions over time
-contrib_df = pd.DataFrame(indicators)
-contrib_df = contrib_df.fillna(0)
+contrib_df = pd.DataFrame(signals[indicator_cols].to_numpy() * indicator_weights,
+                          index=signals.index, columns=indicator_names).fillna(0)
 
 ax1.stackplot(contrib_df.index,
-             contrib_df['Unemployment Rate'],
-             contrib_df['Jobless Claims'],
-             contrib_df['Payrolls'],
-             contrib_df['Labor Participation'],
+             contrib_df.to_numpy().T,
              labels=contrib_df.columns,
              alpha=0.8,
              colors=['#E63946', '#F1FAEE', '#A8DADC', '#457B9D'])
@@ -277,18 +346,16 @@ for bar, val in zip(bars, avg_contrib.values):
     ax2.text(val + 0.005, bar.get_y() + bar.get_height()/2,
             f'{pct:.1f}%', va='center', fontsize=10, fontweight='bold')
 
-plt.tight_layout()
-plt.savefig(viz_dir / '6_factor_attribution.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '6_factor_attribution.png', dpi=DPI)
 
 # Chart 7: COVID case study
 # Focus on COVID period
-covid_start = '2020-01-01'
-covid_end = '2020-06-30'
-covid_bt = backtest.loc[covid_start:covid_end].copy()
-covid_sig = signals.loc[covid_start:covid_end].copy()
+covid_start = KEY_DATES['case_study_start']
+covid_end = KEY_DATES['case_study_end']
+covid_bt = backtest.loc[covid_start:covid_end]
+covid_sig = signals.loc[covid_start:covid_end]
 
-fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 12), sharex=True)
+ax1, ax2, ax3 = new_chart((14, 12), 3, 1, sharex=True)
 
 # Top: Equity curves during COVID
 ax1.plot(covid_bt.index, (covid_bt['strategy_cumulative'] / covid_bt['strategy_cumulative'].iloc[0] - 1) * 100,
@@ -305,13 +372,13 @@ ax1.grid(True, alpha=0.3)
 
 # Add annotations for key dates
 key_dates = [
-    ('2020-02-19', 'SPY Peak'),
-    ('2020-03-23', 'SPY Bottom\n-33.7%'),
+    (KEY_DATES['spy_peak'], 'SPY Peak'),
+    (KEY_DATES['spy_bottom'], 'SPY Bottom\n-33.7%'),
 ]
 for date, label in key_dates:
     y_val = (covid_bt.loc[date, 'spy_cumulative'] / covid_bt['spy_cumulative'].iloc[0] - 1) * 100
-    ax1.axvline(x=pd.to_datetime(date), color='red', linestyle='--', alpha=0.5, linewidth=1)
-    ax1.text(pd.to_datetime(date), y_val - 5, label, fontsize=9, ha='center',
+    ax1.axvline(x=date, color='red', linestyle='--', alpha=0.5, linewidth=1)
+    ax1.text(date, y_val - 5, label, fontsize=9, ha='center',
             bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
 
 # Middle: Allocation shifts
@@ -325,16 +392,13 @@ ax2.set_ylim(0, 100)
 ax2.legend(loc='upper right', fontsize=10)
 ax2.grid(True, alpha=0.3)
 
-# Annotate allocation changes
-for idx in covid_sig.index:
-    if covid_sig.loc[idx, 'signal'] != 0:
-        signal_val = covid_sig.loc[idx, 'signal']
-        if signal_val == -1:
-            ax2.annotate('Risk-OFF\n(80% TLT)', xy=(idx, 20), xytext=(0, -20),
-                       textcoords='offset points', fontsize=8, color='darkred',
-                       bbox=dict(boxstyle='round,pad=0.3', facecolor='pink', alpha=0.8),
-                       arrowprops=dict(arrowstyle='->', color='red'))
-            break
+# Annotate the first Risk-OFF month
+covid_risk_off = np.flatnonzero(covid_sig['signal'].to_numpy() == -1)
+if covid_risk_off.size:
+    ax2.annotate('Risk-OFF\n(80% TLT)', xy=(covid_sig.index[covid_risk_off[0]], 20), xytext=(0, -20),
+               textcoords='offset points', fontsize=8, color='darkred',
+               bbox=dict(boxstyle='round,pad=0.3', facecolor='pink', alpha=0.8),
+               arrowprops=dict(arrowstyle='->', color='red'))
 
 # Bottom: Composite signal
 ax3.plot(covid_sig.index, covid_sig['smoothed_surprise'],
@@ -357,26 +421,28 @@ ax3.annotate(f'Signal Plunges\n{covid_sig["smoothed_surprise"].min():.2f}σ',
             fontsize=9, bbox=dict(boxstyle='round,pad=0.5', facecolor='red', alpha=0.7),
             arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.3'))
 
-plt.tight_layout()
-plt.savefig(viz_dir / '7_covid_case_study.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '7_covid_case_study.png', dpi=DPI)
 
 # Chart 8: Transaction cost sensitivity analysis
 # Test different transaction cost assumptions
 tc_levels = [0, 2.5, 5, 10, 15, 20, 30]  # basis points
-sharpe_results = []
-return_results = []
+tc_rates = np.array(tc_levels) / 10000
 
-for tc_bps in tc_levels:
-    tc_rate = tc_bps / 10000
-    returns_net = backtest['portfolio_return'] - (backtest['weight_change'] * tc_rate)
-    sharpe = (returns_net.mean() / returns_net.std()) * np.sqrt(252)
-    total_ret = ((1 + returns_net.fillna(0)).cumprod().iloc[-1] - 1) * 100
+# Drop NaN days once up front (pandas skipped them in mean/std and
+# fillna(0) made them a no-op in the compounded return)
+portfolio_return = backtest['portfolio_return'].to_numpy()
+weight_change = backtest['weight_change'].to_numpy()
+valid = ~(np.isnan(portfolio_return) | np.isnan(weight_change))
+portfolio_return = portfolio_return[valid]
+weight_change = weight_change[valid]
 
-    sharpe_results.append(sharpe)
-    return_results.append(total_ret)
+# One row of net returns per cost level, shape (len(tc_levels), n_days)
+returns_net = portfolio_return[None, :] - weight_change[None, :] * tc_rates[:, None]
 
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 7))
+sharpe_results = returns_net.mean(axis=1) / returns_net.std(axis=1, ddof=1) * np.sqrt(252)
+return_results = (np.prod(1 + returns_net, axis=1) - 1) * 100
+
+ax1, ax2 = new_chart((16, 7), 1, 2)
 
 # Left: Sharpe vs transaction costs
 ax1.plot(tc_levels, sharpe_results, marker='o', markersize=10, linewidth=2.5,
@@ -404,8 +470,8 @@ ax2.legend(fontsize=10)
 ax2.grid(True, alpha=0.3)
 ax2.set_ylim([265, 273])
 
-plt.tight_layout()
-plt.savefig(viz_dir / '8_transaction_cost_sensitivity.png', dpi=300, bbox_inches='tight')
-plt.close()
+plt.savefig(viz_dir / '8_transaction_cost_sensitivity.png', dpi=DPI)
+
+plt.close(fig)
 
 # All 8 charts saved to visualizations folder
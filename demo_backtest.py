@@ -21,16 +21,23 @@ payroll_surprises = np.random.randn(n_periods)
 participation_surprises = np.random.randn(n_periods)
 
 # Create composite surprise index (like your actual model)
-composite_surprise = (
-    0.4 * unemployment_surprises +
-    0.3 * claims_surprises +
-    0.2 * payroll_surprises +
-    0.1 * participation_surprises
-)
+surprise_matrix = np.stack([
+    unemployment_surprises,
+    claims_surprises,
+    payroll_surprises,
+    participation_surprises
+], axis=1)
+surprise_weights = np.array([0.4, 0.3, 0.2, 0.1])
+composite_surprise = surprise_matrix @ surprise_weights
 
 # Apply simple Kalman filter (smoothing)
-from scipy.ndimage import gaussian_filter1d
-filtered_surprise = gaussian_filter1d(composite_surprise, sigma=1.5)
+# Gaussian kernel (sigma=1.5, truncated at 4 sigma) with reflected edges
+sigma = 1.5
+radius = int(4 * sigma + 0.5)
+kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+kernel /= kernel.sum()
+padded = np.pad(composite_surprise, radius, mode='symmetric')
+filtered_surprise = np.convolve(padded, kernel, mode='valid')
 
 # Generate trading signals
 signals = np.zeros(n_periods)
@@ -41,17 +48,13 @@ signals[filtered_surprise < -0.5] = -1  # Risk-OFF
 spy_returns = np.random.normal(0.0008, 0.012, n_periods)  # ~10% annual, 15% vol
 tlt_returns = np.random.normal(0.0003, 0.008, n_periods)  # ~4% annual, 10% vol
 # Add negative correlation
-tlt_returns = tlt_returns - 0.4 * spy_returns
+np.subtract(tlt_returns, 0.4 * spy_returns, out=tlt_returns)
 
 # Calculate strategy returns based on signals
-strategy_returns = np.zeros(n_periods)
-for i in range(n_periods):
-    if signals[i] == 1:  # Risk-ON
-        strategy_returns[i] = 0.8 * spy_returns[i] + 0.2 * tlt_returns[i]
-    elif signals[i] == -1:  # Risk-OFF
-        strategy_returns[i] = 0.2 * spy_returns[i] + 0.8 * tlt_returns[i]
-    else:  # Neutral
-        strategy_returns[i] = 0.5 * spy_returns[i] + 0.5 * tlt_returns[i]
+# Risk-ON: 80% SPY, Risk-OFF: 20% SPY, Neutral: 50/50
+spy_weight = np.where(signals == 1, 0.8, np.where(signals == -1, 0.2, 0.5))
+tlt_weight = 1 - spy_weight
+strategy_returns = spy_weight * spy_returns + tlt_weight * tlt_returns
 
 # Account for transaction costs (5 bps when rebalancing)
 signal_changes = np.diff(signals, prepend=0)
@@ -69,12 +72,12 @@ sharpe_ratio = (strategy_returns.mean() / strategy_returns.std()) * np.sqrt(12)
 spy_sharpe = (spy_returns.mean() / spy_returns.std()) * np.sqrt(12)
 
 # Drawdown calculation
-running_max = pd.Series(cumulative_returns).cummax()
-drawdown = (pd.Series(cumulative_returns) - running_max) / running_max
+running_max = np.maximum.accumulate(cumulative_returns)
+drawdown = cumulative_returns / running_max - 1
 max_drawdown = drawdown.min() * 100
 
-spy_running_max = pd.Series(spy_cumulative).cummax()
-spy_drawdown = (pd.Series(spy_cumulative) - spy_running_max) / spy_running_max
+spy_running_max = np.maximum.accumulate(spy_cumulative)
+spy_drawdown = spy_cumulative / spy_running_max - 1
 spy_max_dd = spy_drawdown.min() * 100
 
 print("\nBACKTEST RESULTS (5 Years: 2019-2024)")
@@ -92,16 +95,16 @@ print(f"  Max Drawdown:        {spy_max_dd:>8.2f}%")
 print(f"  Final Value:         ${100000 * spy_cumulative[-1]:>12,.2f}")
 
 print("\nSIGNAL DISTRIBUTION:")
-risk_on = (signals == 1).sum()
-risk_off = (signals == -1).sum()
-neutral = (signals == 0).sum()
+risk_on = np.count_nonzero(signals == 1)
+risk_off = np.count_nonzero(signals == -1)
+neutral = np.count_nonzero(signals == 0)
 print(f"  Risk-ON (Long SPY):  {risk_on:>4} months ({risk_on/n_periods*100:.1f}%)")
 print(f"  Risk-OFF (Long TLT): {risk_off:>4} months ({risk_off/n_periods*100:.1f}%)")
 print(f"  Neutral (50/50):     {neutral:>4} months ({neutral/n_periods*100:.1f}%)")
 
 print("\nTRANSACTION COSTS:")
 total_tc = transaction_costs.sum() * 100000
-n_trades = (signal_changes != 0).sum()
+n_trades = np.count_nonzero(signal_changes)
 print(f"  Total Costs:         ${total_tc:>12,.2f}")
 print(f"  Number of Trades:    {n_trades}")
 
@@ -10,9 +10,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 
+from src.data.cache import cached_fetch
+from src.data.price_fetcher import fetch_close
+from src.utils.array_ops import ffill_values, monthly_mean, rolling_mean_std, simple_returns
+
 # Load API key
 load_dotenv()
 FRED_API_KEY = os.getenv('FRED_API_KEY')
@@ -26,11 +31,15 @@ try:
     start_date = '2010-01-01'
     end_date = '2024-12-31'
 
-    # Get monthly data
-    unrate = fred.get_series('UNRATE', start_date, end_date)
-    claims = fred.get_series('ICSA', start_date, end_date)
-    payrolls = fred.get_series('PAYEMS', start_date, end_date)
-    participation = fred.get_series('CIVPART', start_date, end_date)
+    # Get monthly data (cached locally after the first download)
+    def get_series(series_id):
+        return cached_fetch(series_id, start_date, end_date,
+                            lambda: fred.get_series(series_id, start_date, end_date))
+
+    # Downloads are I/O bound, so fetch all four series concurrently
+    series_ids = ['UNRATE', 'ICSA', 'PAYEMS', 'CIVPART']
+    with ThreadPoolExecutor(max_workers=len(series_ids)) as executor:
+        unrate, claims, payrolls, participation = executor.map(get_series, series_ids)
 
 
 except Exception as e:
@@ -41,79 +50,78 @@ except Exception as e:
 # Calculate employment surprises (actual vs 12-month moving average)
 
 # Convert claims to monthly
-claims_monthly = claims.resample('MS').mean()
+claims_monthly = monthly_mean(claims.loc[start_date:end_date])
 
-# Create combined dataframe
+# Create combined dataframe (raw indicators stored as float32, derived
+# statistics are computed in float64)
 df = pd.DataFrame({
     'unemployment_rate': unrate,
     'participation_rate': participation,
     'payrolls': payrolls
-})
+}).astype(np.float32)
 
 # Join claims
+claims_monthly = claims_monthly.astype(np.float32)
 claims_monthly.name = 'initial_claims'
 df = df.join(claims_monthly, how='left')
-df = df.ffill()
+df = pd.DataFrame(ffill_values(df), index=df.index, columns=df.columns)
 
 lookback = 12
 
-df['unrate_ma'] = df['unemployment_rate'].rolling(lookback).mean()
-df['claims_ma'] = df['initial_claims'].rolling(lookback).mean()
-df['payrolls_ma'] = df['payrolls'].rolling(lookback).mean()
-df['participation_ma'] = df['participation_rate'].rolling(lookback).mean()
+# Indicators as one (T, 4) matrix, in the same order as the output columns
+indicator_cols = ['unemployment_rate', 'initial_claims', 'payrolls', 'participation_rate']
+ma_cols = ['unrate_ma', 'claims_ma', 'payrolls_ma', 'participation_ma']
+surprise_cols = ['unrate_surprise', 'claims_surprise', 'payrolls_surprise', 'participation_surprise']
+indicators = df[indicator_cols].to_numpy()
+
+# Rolling 12-month mean/std for all indicators in one prefix-sum pass
+rolling_ma, rolling_std = rolling_mean_std(indicators, lookback)
 
 # Z-score surprises
-df['unrate_surprise'] = (df['unemployment_rate'] - df['unrate_ma']) / df['unemployment_rate'].rolling(lookback).std()
-df['claims_surprise'] = (df['initial_claims'] - df['claims_ma']) / df['initial_claims'].rolling(lookback).std()
-df['payrolls_surprise'] = (df['payrolls'] - df['payrolls_ma']) / df['payrolls'].rolling(lookback).std()
-df['participation_surprise'] = (df['participation_rate'] - df['participation_ma']) / df['participation_rate'].rolling(lookback).std()
+surprises = (indicators - rolling_ma) / rolling_std
+
+# Add the moving averages and surprises in a single concat
+derived = pd.DataFrame(np.hstack([rolling_ma, surprises]), index=df.index,
+                       columns=ma_cols + surprise_cols)
+df = pd.concat([df, derived], axis=1)
 
 # Composite surprise (weighted average)
-df['composite_surprise'] = (
-    0.4 * -df['unrate_surprise'] +      # Lower unemployment = good
-    0.3 * -df['claims_surprise'] +      # Lower claims = good
-    0.2 * df['payrolls_surprise'] +     # Higher payrolls = good
-    0.1 * df['participation_surprise']  # Higher participation = good
-)
+surprise_weights = np.array([
+    -0.4,  # Lower unemployment = good
+    -0.3,  # Lower claims = good
+    0.2,   # Higher payrolls = good
+    0.1,   # Higher participation = good
+])
+df['composite_surprise'] = surprises @ surprise_weights
 
 # Simple smoothing (3-month MA)
 df['smoothed_surprise'] = df['composite_surprise'].rolling(3).mean()
 
 # Generate trading signals based on thresholds
 
-df['signal'] = 0
-df.loc[df['smoothed_surprise'] > 0.5, 'signal'] = 1    # Risk-ON
-df.loc[df['smoothed_surprise'] < -0.5, 'signal'] = -1  # Risk-OFF
-
-# Allocation weights
-df['spy_weight'] = 0.5  # Default 50/50
-df['tlt_weight'] = 0.5
+smoothed = df['smoothed_surprise'].to_numpy()
+signal = np.where(smoothed > 0.5, 1, np.where(smoothed < -0.5, -1, 0))  # Risk-ON / Risk-OFF / Neutral
+df['signal'] = signal
 
-df.loc[df['signal'] == 1, 'spy_weight'] = 0.8
-df.loc[df['signal'] == 1, 'tlt_weight'] = 0.2
-
-df.loc[df['signal'] == -1, 'spy_weight'] = 0.2
-df.loc[df['signal'] == -1, 'tlt_weight'] = 0.8
+# Allocation weights: 80/20 Risk-ON, 20/80 Risk-OFF, 50/50 Neutral
+df['spy_weight'] = 0.5 + 0.3 * signal
+df['tlt_weight'] = 0.5 - 0.3 * signal
 
 # Fetch SPY/TLT price data from yfinance
 
 try:
-    import yfinance as yf
-
-    spy_ticker = yf.Ticker('SPY')
-    tlt_ticker = yf.Ticker('TLT')
-
-    spy_hist = spy_ticker.history(start=start_date, end=end_date)
-    tlt_hist = tlt_ticker.history(start=start_date, end=end_date)
+    # Both tickers in one request, adjusted closes only
+    close = fetch_close(['SPY', 'TLT'], start_date, end_date)
 
+    # Prices stored as float32, returns computed in float64
     prices = pd.DataFrame({
-        'spy_price': spy_hist['Close'],
-        'tlt_price': tlt_hist['Close']
-    })
+        'spy_price': close['SPY'],
+        'tlt_price': close['TLT']
+    }).astype(np.float32)
 
     prices.index = prices.index.tz_localize(None)
-    prices['spy_return'] = prices['spy_price'].pct_change()
-    prices['tlt_return'] = prices['tlt_price'].pct_change()
+    prices['spy_return'] = simple_returns(prices['spy_price'])
+    prices['tlt_return'] = simple_returns(prices['tlt_price'])
 
 except Exception as e:
     print(f"   Error: {e}")
@@ -123,27 +131,38 @@ except Exception as e:
 
 # Run backtest simulation
 
-# Resample signals to daily frequency
-signals_daily = df[['spy_weight', 'tlt_weight']].reindex(prices.index, method='ffill')
+# Resample signals to daily frequency: each day takes the weights of the
+# latest monthly signal on or before it
+signal_pos = np.searchsorted(df.index.to_numpy(), prices.index.to_numpy(), side='right') - 1
+has_signal = signal_pos >= 0
+signal_pos = np.maximum(signal_pos, 0)
 
 # Combine with prices
-backtest = prices.join(signals_daily, how='left')
-backtest = backtest.ffill().fillna(0.5)  # Default to 50/50
+backtest = prices.copy()
+backtest['spy_weight'] = np.where(has_signal, df['spy_weight'].to_numpy()[signal_pos], 0.5)  # Default to 50/50
+backtest['tlt_weight'] = np.where(has_signal, df['tlt_weight'].to_numpy()[signal_pos], 0.5)
 
-# Calculate portfolio returns
-backtest['portfolio_return'] = (
-    backtest['spy_weight'] * backtest['spy_return'] +
-    backtest['tlt_weight'] * backtest['tlt_return']
-)
+spy_w = backtest['spy_weight'].to_numpy()
+tlt_w = backtest['tlt_weight'].to_numpy()
+
+# Calculate portfolio returns (accumulated in place in one buffer)
+portfolio_return = spy_w * backtest['spy_return'].to_numpy()
+portfolio_return += tlt_w * backtest['tlt_return'].to_numpy()
 
 # Transaction costs (5 bps when rebalancing)
-backtest['weight_change'] = backtest['spy_weight'].diff().abs()
-backtest['transaction_cost'] = backtest['weight_change'] * 0.0005  # 5 bps
-backtest['portfolio_return_net'] = backtest['portfolio_return'] - backtest['transaction_cost']
+weight_change = np.abs(np.diff(spy_w, prepend=np.nan))
+transaction_cost = weight_change * 0.0005  # 5 bps
+portfolio_return_net = portfolio_return - transaction_cost
+
+backtest[['portfolio_return', 'weight_change', 'transaction_cost', 'portfolio_return_net']] = np.column_stack([
+    portfolio_return, weight_change, transaction_cost, portfolio_return_net
+])
 
 # Calculate cumulative returns
-backtest['strategy_cumulative'] = (1 + backtest['portfolio_return_net'].fillna(0)).cumprod()
-backtest['spy_cumulative'] = (1 + backtest['spy_return'].fillna(0)).cumprod()
+strategy_cumulative = np.cumprod(1 + backtest['portfolio_return_net'].fillna(0).to_numpy())
+spy_cumulative = np.cumprod(1 + backtest['spy_return'].fillna(0).to_numpy())
+backtest['strategy_cumulative'] = strategy_cumulative
+backtest['spy_cumulative'] = spy_cumulative
 backtest['tlt_cumulative'] = (1 + backtest['tlt_return'].fillna(0)).cumprod()
 
 initial_capital = 100000
@@ -153,29 +172,32 @@ backtest['portfolio_value'] = initial_capital * backtest['strategy_cumulative']
 
 # Strategy metrics
 returns = backtest['portfolio_return_net'].dropna()
-total_return = (backtest['strategy_cumulative'].iloc[-1] - 1) * 100
+total_return = (strategy_cumulative[-1] - 1) * 100
 sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() > 0 else 0
 
 # Drawdown
-running_max = backtest['strategy_cumulative'].cummax()
-drawdown = (backtest['strategy_cumulative'] - running_max) / running_max
+running_max = np.maximum.accumulate(strategy_cumulative)
+drawdown = strategy_cumulative / running_max - 1
 max_drawdown = drawdown.min() * 100
 
 # SPY benchmark
 spy_returns = backtest['spy_return'].dropna()
-spy_total_return = (backtest['spy_cumulative'].iloc[-1] - 1) * 100
+spy_total_return = (spy_cumulative[-1] - 1) * 100
 spy_sharpe = (spy_returns.mean() / spy_returns.std()) * np.sqrt(252)
 
-spy_running_max = backtest['spy_cumulative'].cummax()
-spy_dd = ((backtest['spy_cumulative'] - spy_running_max) / spy_running_max).min() * 100
+spy_running_max = np.maximum.accumulate(spy_cumulative)
+spy_dd = (spy_cumulative / spy_running_max - 1).min() * 100
 
 # Transaction costs
 total_tc = backtest['transaction_cost'].sum() * initial_capital
-n_trades = (backtest['weight_change'] > 0.01).sum()
+n_trades = np.count_nonzero(backtest['weight_change'].to_numpy() > 0.01)
 
-# Win rate
-monthly_returns = backtest['portfolio_return_net'].resample('M').sum()
-win_rate = (monthly_returns > 0).sum() / len(monthly_returns) * 100
+# Win rate (sum daily net returns within each calendar month)
+daily_net = backtest['portfolio_return_net'].fillna(0).to_numpy()
+month_id = backtest.index.to_period('M').asi8
+month_starts = np.flatnonzero(np.diff(month_id, prepend=month_id[0] - 1))
+monthly_returns = np.add.reduceat(daily_net, month_starts)
+win_rate = np.count_nonzero(monthly_returns > 0) / len(monthly_returns) * 100
 
 # Print results
 print("BACKTEST RESULTS (2010-2024)")
@@ -191,7 +213,7 @@ print("\nBENCHMARK (SPY Buy & Hold):")
 print(f"  Total Return:        {spy_total_return:>8.2f}%")
 print(f"  Sharpe Ratio:        {spy_sharpe:>8.2f}")
 print(f"  Max Drawdown:        {spy_dd:>8.2f}%")
-print(f"  Final Value:         ${initial_capital * backtest['spy_cumulative'].iloc[-1]:>12,.2f}")
+print(f"  Final Value:         ${initial_capital * spy_cumulative[-1]:>12,.2f}")
 
 print("\nTRANSACTION COSTS:")
 print(f"  Total Costs:         ${total_tc:>12,.2f}")
@@ -207,5 +229,16 @@ print(f"Downside Protection: Max DD {max_drawdown:.1f}% vs {spy_dd:.1f}%")
 results_dir = Path(__file__).parent / 'results'
 results_dir.mkdir(exist_ok=True)
 
-backtest.to_csv(results_dir / 'full_backtest_results.csv')
-df.to_csv(results_dir / 'employment_signals.csv')
+# Parquet (zstd) by default; set UNEMP_ALPHA_CSV=1 to also export CSV
+results = {'full_backtest_results': backtest, 'employment_signals': df}
+write_csv = os.getenv('UNEMP_ALPHA_CSV', '') not in ('', '0')
+
+for name, table in results.items():
+    if write_csv:
+        table.to_csv(results_dir / f'{name}.csv')
+    try:
+        table.to_parquet(results_dir / f'{name}.parquet', compression='zstd')
+    except ImportError:
+        # No parquet engine installed, fall back to CSV
+        print("   pyarrow not installed, saving CSV instead")
+        table.to_csv(results_dir / f'{name}.csv')
@@ -5,8 +5,9 @@
 
 import pandas as pd
 import numpy as np
-import warnings
-warnings.filterwarnings('ignore')
+
+from src.data.price_fetcher import fetch_close
+from src.utils.array_ops import simple_returns
 
 class BacktestEngine:
 
@@ -22,8 +23,7 @@ class BacktestEngine:
         prices = self._fetch_price_data(start_date, end_date)
 
         # Merge signals with prices
-        df = signals.join(prices, how='right')
-        df = df.fillna(method='ffill')
+        df = self._align_signals(signals, prices).join(prices.ffill())
 
         # Run the backtest
         portfolio = self._initialize_portfolio(df)
@@ -34,20 +34,27 @@ class BacktestEngine:
 
         return results
 
+    def _align_signals(self, signals, prices):
+        # Each trading day takes the latest signal row on or before it
+        signals = signals.ffill()
+        pos = np.searchsorted(signals.index.to_numpy(), prices.index.to_numpy(), side='right') - 1
+        aligned = signals.iloc[np.maximum(pos, 0)].set_axis(prices.index)
+
+        # Days before the first signal have none
+        return aligned.where(np.broadcast_to((pos >= 0)[:, None], aligned.shape))
+
     def _fetch_price_data(self, start_date, end_date):
         try:
-            import yfinance as yf
-
-            spy = yf.download('SPY', start=start_date, end=end_date, progress=False)
-            tlt = yf.download('TLT', start=start_date, end=end_date, progress=False)
+            close = self._download_close(start_date, end_date)
 
+            # Prices stored as float32, returns computed in float64
             df = pd.DataFrame({
-                'spy_price': spy['Adj Close'],
-                'tlt_price': tlt['Adj Close']
-            })
+                'spy_price': close['SPY'],
+                'tlt_price': close['TLT']
+            }).astype(np.float32)
 
-            df['spy_return'] = df['spy_price'].pct_change()
-            df['tlt_return'] = df['tlt_price'].pct_change()
+            df['spy_return'] = simple_returns(df['spy_price'])
+            df['tlt_return'] = simple_returns(df['tlt_price'])
 
             return df
 
@@ -55,6 +62,10 @@ class BacktestEngine:
             print("Using simulated price data")
             return self._generate_demo_prices(start_date, end_date)
 
+    def _download_close(self, start_date, end_date):
+        # Both tickers in one request (one connection), adjusted closes only
+        return fetch_close(['SPY', 'TLT'], start_date, end_date)
+
     def _generate_demo_prices(self, start_date, end_date):
         dates = pd.date_range(start=start_date, end=end_date, freq='D')
         np.random.seed(42)
@@ -90,69 +101,88 @@ class BacktestEngine:
             df['spy_weight'] = 0.5
             df['tlt_weight'] = 0.5
 
-        prev_spy_shares = 0.0
-        prev_tlt_shares = 0.0
-        prev_portfolio_value = self.initial_capital
-
-        for i in range(len(df)):
-            if i == 0:
-                continue
-
-            # Get current prices and weights
-            spy_price = df['spy_price'].iloc[i]
-            tlt_price = df['tlt_price'].iloc[i]
-            spy_weight = df['spy_weight'].iloc[i]
-            tlt_weight = df['tlt_weight'].iloc[i]
-
-            # Calculate portfolio value from price changes
-            current_value = (prev_spy_shares * spy_price +
-                           prev_tlt_shares * tlt_price)
-
-            # Check if we need to rebalance
-            if self._should_rebalance(df.index[i], df.index[i-1]):
-                # Target positions
-                target_spy_value = current_value * spy_weight
-                target_tlt_value = current_value * tlt_weight
-
-                new_spy_shares = target_spy_value / spy_price
-                new_tlt_shares = target_tlt_value / tlt_price
-
-                # Calculate turnover
-                turnover = (abs(new_spy_shares - prev_spy_shares) * spy_price +
-                          abs(new_tlt_shares - prev_tlt_shares) * tlt_price)
-
-                # Calculate transaction costs
-                costs = turnover * self.transaction_cost_bps
-
-                # Update
-                df.loc[df.index[i], 'spy_shares'] = new_spy_shares
-                df.loc[df.index[i], 'tlt_shares'] = new_tlt_shares
-                df.loc[df.index[i], 'turnover'] = turnover
-                df.loc[df.index[i], 'transaction_costs'] = costs
-                df.loc[df.index[i], 'portfolio_value'] = current_value - costs
-
-                prev_spy_shares = new_spy_shares
-                prev_tlt_shares = new_tlt_shares
-                prev_portfolio_value = current_value - costs
-            else:
-                # No rebalancing, just mark to market
-                df.loc[df.index[i], 'spy_shares'] = prev_spy_shares
-                df.loc[df.index[i], 'tlt_shares'] = prev_tlt_shares
-                df.loc[df.index[i], 'portfolio_value'] = current_value
-                prev_portfolio_value = current_value
+        n = len(df)
+        spy_price = df['spy_price'].to_numpy(dtype=np.float64)
+        tlt_price = df['tlt_price'].to_numpy(dtype=np.float64)
+        spy_weight = df['spy_weight'].to_numpy(dtype=np.float64)
+        tlt_weight = df['tlt_weight'].to_numpy(dtype=np.float64)
+
+        # Holdings carried into the first rebalance
+        init_spy_shares = 0.0
+        init_tlt_shares = 0.0
+
+        # Rebalance days (the first row is never traded)
+        rebalance = self._rebalance_mask(df.index)
+        rebal_idx = np.flatnonzero(rebalance)
+
+        rebal_spy_price = spy_price[rebal_idx]
+        rebal_tlt_price = tlt_price[rebal_idx]
+        rebal_spy_weight = spy_weight[rebal_idx]
+        rebal_tlt_weight = tlt_weight[rebal_idx]
+
+        # Pre-trade value at each rebalance: the previous target mix grown by
+        # price changes since the last rebalance (costs are booked against
+        # portfolio_value but not taken out of the holdings)
+        growth = np.ones(len(rebal_idx))
+        growth[1:] = (rebal_spy_weight[:-1] * rebal_spy_price[1:] / rebal_spy_price[:-1] +
+                      rebal_tlt_weight[:-1] * rebal_tlt_price[1:] / rebal_tlt_price[:-1])
+        first_value = (init_spy_shares * rebal_spy_price[:1] +
+                       init_tlt_shares * rebal_tlt_price[:1])
+        current_value = first_value * np.cumprod(growth)
+
+        # Target positions
+        new_spy_shares = current_value * rebal_spy_weight / rebal_spy_price
+        new_tlt_shares = current_value * rebal_tlt_weight / rebal_tlt_price
+        prev_spy_shares = np.concatenate([[init_spy_shares], new_spy_shares[:-1]])
+        prev_tlt_shares = np.concatenate([[init_tlt_shares], new_tlt_shares[:-1]])
+
+        # Turnover and transaction costs
+        turnover = (np.abs(new_spy_shares - prev_spy_shares) * rebal_spy_price +
+                    np.abs(new_tlt_shares - prev_tlt_shares) * rebal_tlt_price)
+        costs = turnover * self.transaction_cost_bps
+
+        # Broadcast holdings across each hold segment and mark to market
+        segment = np.cumsum(rebalance)
+        spy_shares = np.concatenate([[init_spy_shares], new_spy_shares])[segment]
+        tlt_shares = np.concatenate([[init_tlt_shares], new_tlt_shares])[segment]
+        portfolio_value = spy_shares * spy_price + tlt_shares * tlt_price
+        portfolio_value[rebal_idx] = current_value - costs
+
+        # First row keeps its initialized state
+        spy_shares[0] = df['spy_shares'].iat[0]
+        tlt_shares[0] = df['tlt_shares'].iat[0]
+        portfolio_value[0] = df['portfolio_value'].iat[0]
+
+        turnover_col = np.zeros(n)
+        turnover_col[rebal_idx] = turnover
+        costs_col = np.zeros(n)
+        costs_col[rebal_idx] = costs
 
         # Calculate returns
-        df['strategy_return'] = df['portfolio_value'].pct_change()
+        strategy_return = simple_returns(portfolio_value)
+
+        # Write all simulated columns back in one block
+        df[['spy_shares', 'tlt_shares', 'portfolio_value', 'turnover',
+            'transaction_costs', 'strategy_return']] = np.column_stack([
+            spy_shares, tlt_shares, portfolio_value, turnover_col, costs_col, strategy_return
+        ])
 
         return df
 
-    def _should_rebalance(self, current_date, prev_date):
+    def _rebalance_mask(self, index):
+        # True on days where the month (or ISO week) differs from the previous day
+        rebalance = np.zeros(len(index), dtype=bool)
+
         if self.rebalance_freq == 'M':
-            return current_date.month != prev_date.month
+            period = index.month.to_numpy()
         elif self.rebalance_freq == 'W':
-            return current_date.week != prev_date.week
+            period = index.isocalendar().week.to_numpy()
         else:
-            return True
+            rebalance[1:] = True
+            return rebalance
+
+        rebalance[1:] = period[1:] != period[:-1]
+        return rebalance
 
     def _calculate_metrics(self, portfolio):
         # Remove NaN values
@@ -164,7 +194,8 @@ class BacktestEngine:
 
         # Risk metrics
         sharpe = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() > 0 else 0
-        sortino = (returns.mean() / returns[returns < 0].std()) * np.sqrt(252) if len(returns[returns < 0]) > 0 else 0
+        downside = returns[returns < 0]
+        sortino = (returns.mean() / downside.std()) * np.sqrt(252) if len(downside) > 0 else 0
 
         # Drawdown
         cumulative = (1 + returns).cumprod()
@@ -185,15 +216,14 @@ class BacktestEngine:
             'total_transaction_costs': total_costs,
             'avg_monthly_turnover': avg_turnover,
             'final_value': portfolio['portfolio_value'].iloc[-1],
-            'n_trades': (portfolio['turnover'] > 0).sum()
+            'n_trades': np.count_nonzero(portfolio['turnover'].to_numpy() > 0)
         }
 
     def get_benchmark_comparison(self, portfolio_df, start_date, end_date):
-        # Get SPY buy and hold
+        # Get SPY buy and hold (reuses the cached price download)
         try:
-            import yfinance as yf
-            spy = yf.download('SPY', start=start_date, end=end_date, progress=False)
-            spy_returns = spy['Adj Close'].pct_change()
+            spy = self._download_close(start_date, end_date)['SPY']
+            spy_returns = pd.Series(simple_returns(spy), index=spy.index)
             spy_cumulative = (1 + spy_returns).cumprod()
 
             # Calculate SPY metrics
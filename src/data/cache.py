@@ -0,0 +1,63 @@
+# Download Cache
+# Stores raw FRED / yfinance downloads as local Parquet files
+# Keyed by (series, start, end) so re-runs skip the network entirely
+# Location: ~/.cache/unemp_alpha (override with UNEMP_ALPHA_CACHE)
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path(os.environ.get('UNEMP_ALPHA_CACHE', Path.home() / '.cache' / 'unemp_alpha'))
+
+# Column name used when a Series is stored as a one-column frame
+_SERIES_COL = '__series__'
+
+
+def _cache_path(series_id, start, end):
+    key = f'{series_id}|{start}|{end}'
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return CACHE_DIR / f'{digest}.parquet'
+
+
+def _is_usable(data):
+    # Empty downloads or all-NaN columns mean the fetch failed (yfinance
+    # returns an empty frame instead of raising when offline)
+    if data is None or len(data) == 0:
+        return False
+    if isinstance(data, pd.Series):
+        return bool(data.notna().any())
+    return bool(data.notna().any(axis=0).all())
+
+
+def cached_fetch(series_id, start, end, fetch):
+    # Return the cached download for (series_id, start, end), calling fetch() on a miss
+    path = _cache_path(series_id, start, end)
+
+    if path.exists():
+        try:
+            data = pd.read_parquet(path)
+            if list(data.columns) == [_SERIES_COL]:
+                data = data[_SERIES_COL].rename(None)
+            if _is_usable(data):
+                return data
+        except Exception:
+            # Unreadable cache file (or no parquet engine), download again
+            pass
+
+    data = fetch()
+
+    # Raise so callers fall back as they would on a failed request; never cache it
+    if not _is_usable(data):
+        raise ValueError(f"Download for {series_id} returned no data")
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        frame = data.to_frame(_SERIES_COL) if isinstance(data, pd.Series) else data
+        frame.to_parquet(path)
+    except Exception:
+        # Caching is best effort, never fail the download because of it
+        pass
+
+    return data
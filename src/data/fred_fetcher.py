@@ -6,8 +6,9 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data.cache import cached_fetch
 
 class FREDFetcher:
 
@@ -34,9 +35,9 @@ class FREDFetcher:
             from fredapi import Fred
             fred = Fred(api_key=self.api_key)
 
-            unrate = fred.get_series(self.SERIES_IDS['unemployment_rate'], start_date, end_date)
-            civpart = fred.get_series(self.SERIES_IDS['labor_participation'], start_date, end_date)
-            payrolls = fred.get_series(self.SERIES_IDS['nonfarm_payrolls'], start_date, end_date)
+            unrate, civpart, payrolls = self._get_many(
+                fred, ['unemployment_rate', 'labor_participation', 'nonfarm_payrolls'],
+                start_date, end_date)
 
             df = pd.DataFrame({
                 'date': unrate.index,
@@ -63,8 +64,8 @@ class FREDFetcher:
             from fredapi import Fred
             fred = Fred(api_key=self.api_key)
 
-            initial = fred.get_series(self.SERIES_IDS['initial_claims'], start_date, end_date)
-            continued = fred.get_series(self.SERIES_IDS['continued_claims'], start_date, end_date)
+            initial, continued = self._get_many(
+                fred, ['initial_claims', 'continued_claims'], start_date, end_date)
 
             df = pd.DataFrame({
                 'date': initial.index,
@@ -82,6 +83,18 @@ class FREDFetcher:
             print(f"Error fetching data: {e}")
             return self._generate_demo_data(start_date, end_date, 'claims')
 
+    def _get_series(self, fred, name, start_date, end_date):
+        # Served from the local Parquet cache after the first download
+        series_id = self.SERIES_IDS[name]
+        return cached_fetch(series_id, start_date, end_date,
+                            lambda: fred.get_series(series_id, start_date, end_date))
+
+    def _get_many(self, fred, names, start_date, end_date):
+        # Downloads are I/O bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            return list(executor.map(
+                lambda name: self._get_series(fred, name, start_date, end_date), names))
+
     def _generate_demo_data(self, start_date, end_date, data_type):
         dates = pd.date_range(start=start_date, end=end_date, freq='MS')
 
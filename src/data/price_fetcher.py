@@ -0,0 +1,23 @@
+# Price Fetcher
+# Downloads adjusted daily closes from yfinance in one batched request
+# Shared by employment_strategy.py and the backtest engine (same cache entry)
+
+from src.data.cache import cached_fetch
+
+
+def fetch_close(tickers, start_date, end_date):
+    # Adjusted closes for all tickers, one column per ticker, cached locally
+    import yfinance as yf
+
+    tickers = list(tickers)
+    close = cached_fetch(f"yf:close:{','.join(tickers)}", start_date, end_date,
+                         lambda: yf.download(tickers, start=start_date, end=end_date,
+                                             group_by='ticker', auto_adjust=True,
+                                             progress=False).xs('Close', axis=1, level=1))
+
+    # yf.download doesn't raise on failure, so check every ticker came back
+    if (close.empty or not set(tickers).issubset(close.columns)
+            or close[tickers].isna().all().any()):
+        raise ValueError(f"{'/'.join(tickers)} price download failed")
+
+    return close
@@ -5,7 +5,29 @@
 
 import pandas as pd
 import numpy as np
-from scipy import stats
+
+from src.utils.array_ops import ffill_values, monthly_mean, rolling_mean_std
+
+
+def kalman_filter_1d(observations, process_variance=0.01, observation_variance=1.0,
+                     initial_mean=0.0, initial_variance=1.0):
+    # Filtered state means of a scalar random walk observed with noise.
+    # The first observation updates the prior directly (no predict step),
+    # matching pykalman's KalmanFilter.filter with 1x1 matrices.
+    z = np.asarray(observations, dtype=np.float64)
+    filtered = np.empty(len(z))
+
+    state, variance = initial_mean, initial_variance
+    for i in range(len(z)):
+        if i > 0:
+            variance += process_variance
+        gain = variance / (variance + observation_variance)
+        state += gain * (z[i] - state)
+        variance *= 1.0 - gain
+        filtered[i] = state
+
+    return filtered
+
 
 class SurpriseCalculator:
 
@@ -15,75 +37,66 @@ class SurpriseCalculator:
 
     def calculate_composite_surprise(self, unemployment_data, claims_data):
         # Convert claims to monthly frequency
-        claims_monthly = claims_data.resample('MS').mean()
+        claims_monthly = monthly_mean(claims_data)
 
         # Combine datasets
         df = unemployment_data.join(claims_monthly, how='left')
-        df = df.ffill()
+        df = pd.DataFrame(ffill_values(df), index=df.index, columns=df.columns)
 
-        # Calculate surprises for each indicator
-        df['unrate_surprise'] = self._calculate_surprise(df['unemployment_rate'], invert=True)
-        df['claims_surprise'] = self._calculate_surprise(df['initial_claims'], invert=True)
+        # Stack the indicators into one (T, K) matrix; sign +1 means higher is good news
+        indicators = [
+            ('unrate_surprise', df['unemployment_rate'], -1.0),
+            ('claims_surprise', df['initial_claims'], -1.0),
+        ]
 
         if 'participation_rate' in df.columns:
-            df['participation_surprise'] = self._calculate_surprise(df['participation_rate'])
+            indicators.append(('participation_surprise', df['participation_rate'], 1.0))
 
         if 'nonfarm_payrolls' in df.columns:
-            df['payrolls_surprise'] = self._calculate_surprise(df['nonfarm_payrolls'].diff())
+            indicators.append(('payrolls_surprise', df['nonfarm_payrolls'].diff(), 1.0))
+
+        surprise_cols = [name for name, _, _ in indicators]
+        values = np.column_stack([series.to_numpy(dtype=np.float64) for _, series, _ in indicators])
+        signs = np.array([sign for _, _, sign in indicators])
+
+        # Rolling z-scores for all indicators in one pass
+        surprises = self._calculate_surprise(values) * signs
+        df[surprise_cols] = surprises
 
-        # Composite index - just average all the surprises
-        surprise_cols = [col for col in df.columns if 'surprise' in col]
-        df['composite_surprise'] = df[surprise_cols].mean(axis=1)
+        # Composite index - just average all the surprises (skipping NaNs)
+        n_valid = (~np.isnan(surprises)).sum(axis=1)
+        total = np.nansum(surprises, axis=1)
+        df['composite_surprise'] = np.where(n_valid > 0, total / np.maximum(n_valid, 1), np.nan)
 
         # Apply Kalman filter to smooth out noise
         df['filtered_surprise'] = self._apply_kalman_filter(df['composite_surprise'])
 
         return df
 
-    def _calculate_surprise(self, series, invert=False):
-        # Use rolling window to get "expected" value
-        rolling_mean = series.rolling(window=self.lookback_window, min_periods=self.lookback_window//2).mean()
-        rolling_std = series.rolling(window=self.lookback_window, min_periods=self.lookback_window//2).std()
+    def _calculate_surprise(self, values):
+        # Use rolling window to get "expected" value (column-wise for 2D input)
+        rolling_mean, rolling_std = rolling_mean_std(values, self.lookback_window,
+                                                     self.lookback_window//2)
 
         # Calculate z-score
-        surprise = (series - rolling_mean) / (rolling_std + 1e-8)
-
-        if invert:
-            surprise = -surprise
-
-        return surprise
+        return (values - rolling_mean) / (rolling_std + 1e-8)
 
     def _apply_kalman_filter(self, series, process_variance=0.01):
-        try:
-            from pykalman import KalmanFilter
-
-            # Drop NaN values for Kalman filter
-            clean_series = series.dropna()
-
-            if len(clean_series) < 2:
-                # Not enough data, fall back to moving average
-                return series.rolling(window=3, min_periods=1).mean()
+        # Drop NaN values for Kalman filter
+        clean_series = series.dropna()
 
-            kf = KalmanFilter(
-                transition_matrices=[1],
-                observation_matrices=[1],
-                initial_state_mean=0,
-                initial_state_covariance=1,
-                observation_covariance=1,
-                transition_covariance=process_variance
-            )
-
-            state_means, _ = kf.filter(clean_series.values)
+        if len(clean_series) < 2:
+            # Not enough data, fall back to moving average
+            return series.rolling(window=3, min_periods=1).mean()
 
-            # Create a series with the same index as the clean series
-            filtered = pd.Series(state_means.flatten(), index=clean_series.index)
+        state_means = kalman_filter_1d(clean_series.to_numpy(dtype=np.float64),
+                                       process_variance=process_variance)
 
-            # Reindex to match original series (will have NaN where original had NaN)
-            return filtered.reindex(series.index)
+        # Create a series with the same index as the clean series
+        filtered = pd.Series(state_means, index=clean_series.index)
 
-        except (ImportError, Exception):
-            # If pykalman not installed or fails, just use simple moving average
-            return series.rolling(window=3, min_periods=1).mean()
+        # Reindex to match original series (will have NaN where original had NaN)
+        return filtered.reindex(series.index)
 
     def get_signal_strength(self, surprise_value):
         if abs(surprise_value) < self.z_score_threshold:
@@ -20,9 +20,9 @@ class SignalGenerator:
         signal_col = 'filtered_surprise' if 'filtered_surprise' in df.columns else 'composite_surprise'
 
         # Generate signals based on thresholds
-        df['raw_signal'] = 0
-        df.loc[df[signal_col] > self.long_threshold, 'raw_signal'] = 1    # Good news = risk on
-        df.loc[df[signal_col] < self.short_threshold, 'raw_signal'] = -1  # Bad news = risk off
+        surprise = df[signal_col].to_numpy()
+        df['raw_signal'] = np.where(surprise > self.long_threshold, 1,           # Good news = risk on
+                           np.where(surprise < self.short_threshold, -1, 0))    # Bad news = risk off
 
         # Apply regime filter if enabled
         if self.use_regime_filter:
@@ -54,28 +54,22 @@ class SignalGenerator:
 
     def _generate_allocation(self, df):
         # Simple allocation based on signal
-        df['spy_weight'] = 0.0
-        df['tlt_weight'] = 0.0
+        signal = df['signal'].to_numpy()
+        conditions = [signal == 1, signal == -1, signal == 0]
 
-        # Risk-on: 80% SPY, 20% TLT
-        df.loc[df['signal'] == 1, 'spy_weight'] = 0.8
-        df.loc[df['signal'] == 1, 'tlt_weight'] = 0.2
-
-        # Risk-off: 20% SPY, 80% TLT
-        df.loc[df['signal'] == -1, 'spy_weight'] = 0.2
-        df.loc[df['signal'] == -1, 'tlt_weight'] = 0.8
-
-        # Neutral: 50/50
-        df.loc[df['signal'] == 0, 'spy_weight'] = 0.5
-        df.loc[df['signal'] == 0, 'tlt_weight'] = 0.5
+        # Risk-on: 80% SPY, 20% TLT / Risk-off: 20% SPY, 80% TLT / Neutral: 50/50
+        df['spy_weight'] = np.select(conditions, [0.8, 0.2, 0.5], default=0.0)
+        df['tlt_weight'] = np.select(conditions, [0.2, 0.8, 0.5], default=0.0)
 
         return df
 
     def get_signal_summary(self, signals_df):
         total_signals = len(signals_df)
-        risk_on = (signals_df['signal'] == 1).sum()
-        risk_off = (signals_df['signal'] == -1).sum()
-        neutral = (signals_df['signal'] == 0).sum()
+        # Works for float signals with NaN gaps as well as ints
+        signal = signals_df['signal'].to_numpy()
+        risk_on = np.count_nonzero(signal == 1)
+        risk_off = np.count_nonzero(signal == -1)
+        neutral = np.count_nonzero(signal == 0)
 
         return {
             'total': total_signals,
@@ -0,0 +1,73 @@
+# Array Helpers
+# Generic NumPy routines shared by the data, features and backtest modules
+# (rolling stats, monthly averaging, forward-fill, simple returns)
+
+import numpy as np
+import pandas as pd
+
+
+def rolling_mean_std(values, window, min_periods=None):
+    # Trailing rolling mean and sample std (ddof=1) along axis 0 from prefix
+    # sums, skipping NaNs like pandas rolling(). Data is shifted by its first
+    # valid value before summing to limit cancellation in the squared sums.
+    x = np.asarray(values, dtype=np.float64)
+    if min_periods is None:
+        min_periods = window
+
+    valid = ~np.isnan(x)
+    shift = np.take_along_axis(x, valid.argmax(axis=0)[None], axis=0)[0]
+    shift = np.nan_to_num(shift)
+    centered = np.where(valid, x - shift, 0.0)
+
+    zeros = np.zeros((1,) + x.shape[1:])
+    csum = np.concatenate([zeros, np.cumsum(centered, axis=0)])
+    csum_sq = np.concatenate([zeros, np.cumsum(centered * centered, axis=0)])
+    ccount = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+
+    hi = np.arange(1, len(x) + 1)
+    lo = np.maximum(hi - window, 0)
+    total = csum[hi] - csum[lo]
+    total_sq = csum_sq[hi] - csum_sq[lo]
+    count = ccount[hi] - ccount[lo]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = np.maximum(total_sq - total * mean, 0.0) / (count - 1)
+
+    enough = count >= max(min_periods, 1)
+    rolling_mean = np.where(enough, mean + shift, np.nan)
+    rolling_std = np.where(enough & (count > 1), np.sqrt(var), np.nan)
+    return rolling_mean, rolling_std
+
+
+def monthly_mean(data):
+    # Average a weekly/daily series (or frame) per calendar month, labelled at
+    # month start. Grouping by period only creates the months present in the
+    # data, unlike resample() which allocates every bin between min and max.
+    data = data.dropna(how='all') if isinstance(data, pd.DataFrame) else data.dropna()
+    monthly = data.groupby(data.index.to_period('M')).mean()
+    monthly.index = monthly.index.to_timestamp()
+    return monthly
+
+
+def ffill_values(values):
+    # Forward-fill NaNs along axis 0 by carrying the index of the last valid row
+    # (keeps the input float dtype)
+    x = np.asarray(values)
+    if x.dtype.kind != 'f':
+        x = x.astype(np.float64)
+    rows = np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+    last_valid = np.maximum.accumulate(np.where(np.isnan(x), 0, rows), axis=0)
+    return np.take_along_axis(x, last_valid, axis=0)
+
+
+def simple_returns(prices):
+    # Period-over-period returns with a leading NaN, same as pct_change()
+    # (gaps are padded with the last valid price first)
+    p = ffill_values(np.asarray(prices, dtype=np.float64))
+    returns = np.empty_like(p)
+    returns[:1] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(p[1:], p[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    return returns